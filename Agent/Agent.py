@@ -1,7 +1,9 @@
 from dotenv import load_dotenv
 _ = load_dotenv()
 
+import json
 import operator
+from concurrent.futures import ThreadPoolExecutor
 from typing import TypedDict, Annotated, Dict, Any
 from langgraph.graph import StateGraph, END
 from langchain_core.messages import AnyMessage, SystemMessage, HumanMessage, ToolMessage
@@ -12,11 +14,17 @@ from Data import InitData
 
 import tiktoken
 
-def count_tokens(messages, model="gpt-4o"):
+# Token budget for the context packed up front in prefetched mode
+PREFETCH_TOKEN_BUDGET = 60000
+
+def get_encoding(model="gpt-4o"):
     try:
-        enc = tiktoken.encoding_for_model(model)
+        return tiktoken.encoding_for_model(model)
     except KeyError:
-        enc = tiktoken.get_encoding("cl100k_base")
+        return tiktoken.get_encoding("cl100k_base")
+
+def count_tokens(messages, model="gpt-4o"):
+    enc = get_encoding(model)
 
     total = 0
     for msg in messages:
@@ -28,6 +36,19 @@ def count_tokens(messages, model="gpt-4o"):
         total += len(enc.encode(text))
     return total
 
+def truncate_tokens(text, max_tokens, model="gpt-4o"):
+    enc = get_encoding(model)
+    tokens = enc.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return enc.decode(tokens[:max_tokens])
+
+# Identifies a tool call in actions_taken, so the same tool with other args is not a repeat
+def action_key(tool_name, args=None):
+    if not args:
+        return tool_name
+    return f"{tool_name}({json.dumps(args, sort_keys=True)})"
+
 def pretty_print_messages(messages):
     for msg in messages:
         # System‐level instructions
@@ -53,11 +74,15 @@ class AgentState(TypedDict):
     actions_taken: Annotated[list[str], operator.add]
 
 class Agent:
-    def __init__(self, model:BaseChatModel=None, tools:Tool=None, system:InitData=None):
+    def __init__(self, model:BaseChatModel=None, tools:Tool=None, system:InitData=None, prefetch:list[Tool]=None, prefetch_budget:int=PREFETCH_TOKEN_BUDGET):
         self.system = system
         self.tools = {t.name: t for t in tools} if tools else {}
         self.model = model if tools is None else model.bind_tools(tools)
 
+        # prefetched mode: predictable tools run once up front instead of one LLM round each
+        self.prefetch = prefetch or []
+        self.prefetch_budget = prefetch_budget
+
         # Adds main nodes
         graph = StateGraph(AgentState)
         graph.add_node("llm", self.call_openai)
@@ -68,9 +93,60 @@ class Agent:
         graph.add_conditional_edges("llm", self.exists_action, {True: "give_reason", False: END})
         graph.add_edge("give_reason", "take_action")
         graph.add_edge("take_action", "llm")
-        graph.set_entry_point("llm")
+        if self.prefetch:
+            graph.add_node("prefetch_context", self.prefetch_context)
+            graph.add_edge("prefetch_context", "llm")
+            graph.set_entry_point("prefetch_context")
+        else:
+            graph.set_entry_point("llm")
         self.graph = graph.compile()
 
+    # Runs the predictable tools concurrently and packs their outputs into one prompt
+    def prefetch_context(self, state: AgentState) -> Dict[str, Any]:
+        model = self.system.data.model
+
+        def run(t: Tool) -> str:
+            try:
+                return str(t.invoke({}))
+            except Exception as e:
+                print(f"\n❌ ERROR in prefetched tool '{t.name}': {e}\n")
+                return f"Error: {e}"
+
+        with ThreadPoolExecutor(max_workers=len(self.prefetch)) as pool:
+            results = list(pool.map(run, self.prefetch))
+
+        # packs in the given order, the tools listed first have priority on the budget
+        sections = []
+        actions_taken = []
+        remaining = self.prefetch_budget
+        for t, content in zip(self.prefetch, results):
+            # nothing usable came back -> leave the tool to the model instead of marking it delivered
+            if content in ("", "None") or content.startswith("Error:"):
+                sections.append(f"# OUTPUT OF {t.name} UNAVAILABLE, call {t.name} if needed")
+                print(f"\nprefetch_context() - [LOG INFO] - Tool '{t.name}' returned no usable output\n")
+                continue
+
+            tokens = count_tokens([content], model)
+            if tokens <= remaining:
+                sections.append(content)
+                remaining -= tokens
+                # fully delivered -> the model must not spend a round calling it again
+                actions_taken.append(action_key(t.name))
+            elif remaining > 0:
+                sections.append(truncate_tokens(content, remaining, model))
+                sections.append(f"# OUTPUT OF {t.name} TRUNCATED, call {t.name} for the complete output")
+                remaining = 0
+            else:
+                sections.append(f"# OUTPUT OF {t.name} OMITTED, call {t.name} if needed")
+
+            print(f"\nprefetch_context() - [LOG INFO] - Tool '{t.name}' used tokens_count: {tokens}\n")
+
+        print(f"\nprefetch_context() - [LOG INFO] - Prefetched context contains {self.prefetch_budget - remaining} tokens\n")
+        return {
+            'messages': [HumanMessage(content="\n\n".join(sections))],
+            'actions_taken': actions_taken
+        }
+
     def exists_action(self, state: AgentState) -> bool:
         result = state['messages'][-1]
         return hasattr(result, 'tool_calls') and result.tool_calls is not None and len(result.tool_calls) > 0
@@ -154,7 +230,7 @@ class Agent:
                     "__end__": True
                 }
 
-            if tool_name in actions_taken:
+            if action_key(tool_name, args) in actions_taken:
                 content = "Error: Repeated tool call."
                 print(f"\n❌ ERROR: Repeated tool detected for '{tool_name}'.\n")
                 tool_message = ToolMessage(
@@ -176,7 +252,7 @@ class Agent:
                     raise ValueError(f"Invalid tool: {tool_name}")
 
                 content = str(result)
-                actions_taken.append(tool_name)
+                actions_taken.append(action_key(tool_name, args))
 
                 # print detail what tool returns
                 # print(f"\n✅ Tool '{tool_name}' returned: \n{content}\n\n")
@@ -171,6 +171,118 @@ class CallHierarchy:
         
         return out
 
+@dataclass
+class DependencyIndex:
+    adjacency: Dict[str, List[str]]     # deduplicated callees/symbols of every name in the tree
+    kinds: Dict[str, str]
+    defined: List[str]                  # functions defined in the source file (the roots)
+    cycles: List[List[str]] = field(default_factory=list)
+    rank: Dict[str, int] = field(default_factory=dict)     # topological position, dependencies first
+    _closures: Dict[str, List[str]] = field(default_factory=dict, repr=False)
+    _plans: Dict[str, Tuple[List[str], List[str]]] = field(default_factory=dict, repr=False)
+
+    @staticmethod
+    def from_hierarchy(hierarchy: CallHierarchy, symbol_map: Dict[str, Symbol]) -> "DependencyIndex":
+        adjacency: Dict[str, List[str]] = {}
+
+        # the same symbol shows up under many parents, merge all its occurrences
+        def visit(node: CallTreeNode):
+            children = adjacency.setdefault(node.name, [])
+            for child in node.dependencies.callTree:
+                if child.name not in children:
+                    children.append(child.name)
+                visit(child)
+
+        for root in hierarchy.tree:
+            visit(root)
+
+        # kinds come from the symbol map so both always describe the same occurrence
+        kinds = {name: SYMBOL_KIND_MAP.get(int(symbol.kind)) for name, symbol in symbol_map.items()}
+
+        index = DependencyIndex(adjacency=adjacency, kinds=kinds, defined=[root.name for root in hierarchy.tree])
+        index._walk()
+        for root in index.defined:
+            index.closure(root)
+            index.mock_plan(root)
+        return index
+
+    def _walk(self):
+        """Rank every name in post-order (dependencies first) and record the cycles met on the way."""
+        done = set()
+        path: List[str] = []
+
+        def dfs(name: str):
+            path.append(name)
+            for child in self.adjacency.get(name, []):
+                if child in path:
+                    self.cycles.append(path[path.index(child):] + [child])
+                elif child not in done:
+                    dfs(child)
+            path.pop()
+            done.add(name)
+            self.rank[name] = len(self.rank)
+
+        for name in self.adjacency:
+            if name not in done:
+                dfs(name)
+
+    def closure(self, name: str) -> List[str]:
+        """Return every symbol reachable from name, dependencies before dependents."""
+        if name not in self._closures:
+            seen = {name}
+            stack = [name]
+            while stack:
+                for child in self.adjacency.get(stack.pop(), []):
+                    if child not in seen:
+                        seen.add(child)
+                        stack.append(child)
+            seen.discard(name)
+            self._closures[name] = sorted(seen, key=self.rank.get)
+        return self._closures[name]
+
+    def mock_plan(self, name: str) -> Tuple[List[str], List[str]]:
+        """
+        Split the closure of name into functions to mock and symbols that need
+        their real definition, both dependencies first. Functions defined in the
+        source file are real code, so the walk goes through them; it stops at any
+        other function (a mock).
+        """
+        if name not in self._plans:
+            mocks: List[str] = []
+            definitions: List[str] = []
+            seen = {name}
+            stack = [name]
+            while stack:
+                for child in self.adjacency.get(stack.pop(), []):
+                    if child in seen:
+                        continue
+                    seen.add(child)
+                    if self.kinds.get(child) == "Function" and child not in self.defined:
+                        mocks.append(child)
+                        continue
+                    if self.kinds.get(child) != "Function":
+                        definitions.append(child)
+                    stack.append(child)
+
+            self._plans[name] = (sorted(mocks, key=self.rank.get), sorted(definitions, key=self.rank.get))
+        return self._plans[name]
+
+    def stubs(self, function_ut: str, transitive: bool = False) -> List[str]:
+        """
+        Return the sub-calls of sibling functions that need a shallow stub, in
+        dependency order. Functions that get a deep mock are left out: the direct
+        callees of function_ut, or its whole mock plan when transitive is set.
+        """
+        direct = self.mock_plan(function_ut)[0] if transitive else self.adjacency.get(function_ut, [])
+        out = set()
+        for root in self.defined:
+            if root == function_ut:
+                continue
+            for child in self.adjacency.get(root, []):
+                if self.kinds.get(child) == "Function" and child not in self.defined and child not in direct:
+                    out.add(child)
+        return sorted(out, key=self.rank.get)
+
 # ------------------------------------------------
 # 
 #
@@ -191,9 +303,13 @@ class Data:
     ut_c_template: str
     ut_h_template: str
     symbol_map: Dict[str, Symbol] = field(default_factory=dict)
+    dependency_index: DependencyIndex = field(init=False)
+
+    def __post_init__(self):
+        self.dependency_index = DependencyIndex.from_hierarchy(self.call_hierarchy, self.symbol_map)
 
 class InitData:
-    def __init__(self, model: str, function_ut: str, json_path: str, source_file_path: str, prompt_path: str, ut_c_template_path: str, ut_h_template_path: str):
+    def __init__(self, model: str, function_ut: str, json_path: str, source_file_path: str, prompt_path: str, ut_c_template_path: str, ut_h_template_path: str, prompt_addendum_path: str = None):
         with open(json_path, "r", encoding='utf-8') as f:
           raw = json.load(f)
 
@@ -203,6 +319,11 @@ class InitData:
         with open(prompt_path, "r", encoding='utf-8') as f:
           system_prompt = f.read() 
 
+        # a mode specific addendum only states what differs from the shared prompt
+        if prompt_addendum_path:
+          with open(prompt_addendum_path, "r", encoding='utf-8') as f:
+            system_prompt += "\n\n" + f.read()
+
         with open(ut_c_template_path, 'r',encoding='utf-8') as f:
           ut_c_template = f.read()
 
@@ -46,15 +46,27 @@ def ToolGetFunctionUTDependency(data: Data):
         return GetFunctionUTDependency(data)    # <-- call the correct helper
     return GET_FUNCTION_UT_DEPENDENCY
 
+# One tool to provide the deduplicated transitive dependencies for the function under test
+def ToolGetFunctionUTClosure(data: Data):
+    @tool
+    def GET_FUNCTION_UT_CLOSURE():
+        """
+        List every dependency reachable from the function under test, deduplicated and
+        ordered so that dependencies come before dependents, split into functions to
+        mock and symbols (types, macros, constants) that need their real definitions.
+        """
+        return GetFunctionUTClosure(data)
+    return GET_FUNCTION_UT_CLOSURE
+
 # One tool to provide direct dependencies that need to be mocked 
 #       (to resolve external symbols and compiler linking issue)
-def ToolGetSiblingDependency(data: Data):
+def ToolGetSiblingDependency(data: Data, transitive: bool = False):
     @tool
     def GET_SIBLING_DEPENDENCY():
         """
         List the sub-calls inside sibling functions in the source file under test, for use in generating necessary stubs or mocks to resolve external symbols and linking issues.
         """
-        return GetSiblingDependency(data)
+        return GetSiblingDependency(data, transitive)
     return GET_SIBLING_DEPENDENCY
 
 def ToolTerminate(data: Data):
@@ -112,36 +124,48 @@ def GetFunctionUTDependency(data: Data):
                 output.append(symbol.raw_to_block(symbol.implementation))
     return "\n\n".join(output)
 
-def GetSiblingDependency(data: Data):
-    # output = []
-    # for root in data.call_hierarchy.tree:
-    #     output.append(f'# SUB-CALLS INSIDE **SIBLING** FUNCTION {root.name}:')
-    #     if not root.dependencies.callTree:
-    #         output.append("None")
-    #         continue
-    #     for symbol in root.dependencies.callTree:
-    #         if SYMBOL_KIND_MAP.get(int(symbol.kind)) == "Function":
-    #             output.append(f'## SYMBOL NAME: `{symbol.name}`')
-    #             output.append(f'### KIND: {SYMBOL_KIND_MAP.get(int(symbol.kind))}')
-    #             output.append(f'### DOCUMENTATION: ')
-    #             output.append(symbol.raw_to_block(symbol.documentation))
-    #             output.append(f'### IMPLEMENTATION: ')
-    #             output.append(symbol.raw_to_block(symbol.implementation))
-    # return "\n\n".join(output)
+def GetFunctionUTClosure(data: Data):
+    if data.function_ut not in data.symbol_map:
+        return
+
+    index = data.dependency_index
+    mocks, definitions = index.mock_plan(data.function_ut)
+
+    output = []
+    output.append(f"# DEEP MOCKS FOR FUNCTION UNDER TEST {data.function_ut}")
+    if not mocks:
+        output.append("None")
+    for name in mocks:
+        symbol = data.symbol_map.get(name)
+        output.append(f'## Function signature: \n{symbol.definition}')
+
+    output.append(f"# REAL DEFINITIONS USED BY FUNCTION UNDER TEST {data.function_ut} (dependencies first)")
+    if not definitions:
+        output.append("None")
+    for name in definitions:
+        symbol = data.symbol_map.get(name)
+        output.append(f'## SYMBOL NAME: `{name}`')
+        output.append(f'### KIND: {SYMBOL_KIND_MAP.get(int(symbol.kind))}')
+        output.append(f'### IMPLEMENTATION: ')
+        output.append(symbol.implementation)
+
+    closure = set(index.closure(data.function_ut)) | {data.function_ut}
+    cycles = [cycle for cycle in index.cycles if cycle[0] in closure]
+    if cycles:
+        output.append("# CYCLES")
+        for cycle in cycles:
+            output.append(" -> ".join(cycle))
+    return "\n\n".join(output)
+
+def GetSiblingDependency(data: Data, transitive: bool = False):
     output = []
     output.append(f'# SUB-CALLS INSIDE **SIBLING** FUNCTION:')
-    for root in data.call_hierarchy.tree:
-        if not root.dependencies.callTree:
-            output.append("None")
-            continue
-        for symbol in root.dependencies.callTree:
-            if SYMBOL_KIND_MAP.get(int(symbol.kind)) == "Function":
-                output.append(f'## Function signature: \n{symbol.raw_to_block(symbol.definition)}')
-                # output.append(f'## Function uses below symbols: ')
-                # for sym in root.dependencies.callTree:
-                #     if SYMBOL_KIND_MAP.get(int(symbol.kind)) != "Function":
-                #         output.append(f'### IMPLEMENTATION: ')
-                #         output.append(symbol.raw_to_block(sym.implementation))
+    stubs = data.dependency_index.stubs(data.function_ut, transitive)
+    if not stubs:
+        output.append("None")
+    for name in stubs:
+        symbol = data.symbol_map.get(name)
+        output.append(f'## Function signature: \n{symbol.definition}')
     return "\n\n".join(output)
 
 def GetInitialPrompt(data: Data):
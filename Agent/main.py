@@ -8,7 +8,7 @@ from Data import InitData
 from Tools import ToolGetSourceFile 
 from Tools import ToolGetTestTemplate 
 from Tools import ToolGetDetailForOne
-from Tools import ToolGetFunctionUTDependency 
+from Tools import ToolGetFunctionUTClosure
 from Tools import ToolGetSiblingDependency 
 from Tools import ToolTerminate
 from Tools import GetInitialPrompt
@@ -20,33 +20,42 @@ if __name__ == "__main__":
     source_file_path = 'C:/OpenSIL/webview/Agent/knowledge/sourcefile.c'
     # prompt_path = 'C:/OpenSIL/webview/Agent/knowledge/prompt.md'  # prompt to generate shallow mocks
     prompt_path = 'C:/OpenSIL/webview/Agent/knowledge/_prompt.md'   # promot to generate unit tests
+    prefetched_prompt_path = 'C:/OpenSIL/webview/Agent/knowledge/_prompt_prefetched.md'  # addendum to _prompt.md for prefetched context
     ut_c_template_path = 'C:/OpenSIL/webview/Agent/template/template.c'
     ut_h_template_path = 'C:/OpenSIL/webview/Agent/template/template.h'
     
-    if len(sys.argv) >= 2:
-        function_ut = sys.argv[1]
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if len(args) >= 1:
+        function_ut = args[0]
     else:
         function_ut = input("What function to test: ")
 
+    # prefetched mode runs the predictable tools up front and skips their ReAct rounds
+    prefetched = "--prefetched" in sys.argv
+    prompt_addendum_path = prefetched_prompt_path if prefetched else None
+
     # model = "gpt-4o-mini"
     # model = "gpt-4.1-mini"
     model = "o4-mini"
-    initData = InitData(model=model, function_ut=function_ut, json_path=json_path, source_file_path=source_file_path, prompt_path=prompt_path, ut_c_template_path=ut_c_template_path, ut_h_template_path=ut_h_template_path)
+    initData = InitData(model=model, function_ut=function_ut, json_path=json_path, source_file_path=source_file_path, prompt_path=prompt_path, ut_c_template_path=ut_c_template_path, ut_h_template_path=ut_h_template_path, prompt_addendum_path=prompt_addendum_path)
 
     tool_get_source_file = ToolGetSourceFile( initData.data )
     tool_get_test_template = ToolGetTestTemplate( initData.data )
     tool_get_detail_for_one = ToolGetDetailForOne( initData.data )
-    tool_get_function_ut_dependency = ToolGetFunctionUTDependency(initData.data)
-    tool_get_sibling_dependency = ToolGetSiblingDependency(initData.data)
+    tool_get_function_ut_closure = ToolGetFunctionUTClosure(initData.data)
+    # deep mocks come from the closure, so sibling stubs leave out its whole mock plan
+    tool_get_sibling_dependency = ToolGetSiblingDependency(initData.data, transitive=True)
     tool_terminate = ToolTerminate(initData.data)
 
-    tools = [tool_get_source_file, tool_get_test_template, tool_get_detail_for_one, tool_get_function_ut_dependency, tool_get_sibling_dependency, tool_terminate]
-
+    tools = [tool_get_source_file, tool_get_test_template, tool_get_detail_for_one, tool_get_function_ut_closure, tool_get_sibling_dependency, tool_terminate]
+    # ordered by priority on the prefetch token budget
+    prefetch = [tool_get_test_template, tool_get_source_file, tool_get_function_ut_closure, tool_get_sibling_dependency] if prefetched else None
 
     ReActAgent = Agent(
         model=ChatOpenAI(model=initData.data.model), 
         tools=tools,
-        system=initData
+        system=initData,
+        prefetch=prefetch
     )
 
     for i in range(1):